@@ -1,32 +1,65 @@
 """
 Appointment Service - Handles booking, rescheduling, and cancellation
 """
-from fastapi import FastAPI, HTTPException, Depends, Query, Header
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime, timedelta
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, and_, or_, func
+from sqlalchemy.exc import IntegrityError
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
+import asyncio
+import json
 import structlog
 import httpx
 import os
-from uuid import uuid4
+import orjson
+import redis.asyncio as redis
+import secrets
 
 from database import get_db, init_db
 from models import (
     Appointment, AppointmentCreate, AppointmentUpdate,
-    AppointmentResponse, AppointmentStatus
+    AppointmentResponse, AppointmentStatus, AppointmentStatusResponse
+)
+
+structlog.configure(
+    processors=[
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer(serializer=lambda obj, **kw: orjson.dumps(obj).decode()),
+    ]
 )
 
 logger = structlog.get_logger()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    # Shared client: reuses keepalive connections to downstream services
+    # instead of paying a TCP+TLS handshake per call
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        http2=True,
+        timeout=httpx.Timeout(5.0)
+    )
+    app.state.redis = redis.from_url(REDIS_URL)
+    yield
+    await app.state.http.aclose()
+    await app.state.redis.aclose()
+
 app = FastAPI(
     title="Appointment Service",
     version="v1",
     description="Appointment booking, rescheduling, and cancellation service",
     openapi_url="/v1/openapi.json",
     docs_url="/v1/docs",
-    redoc_url="/v1/redoc"
+    redoc_url="/v1/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -37,10 +70,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def correlation_middleware(request: Request, call_next):
+    """Bind the correlation ID once per request so handlers never re-pass it"""
+    correlation_id = request.headers.get("X-Correlation-ID") or secrets.token_hex(8)
+    structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        return response
+    finally:
+        structlog.contextvars.clear_contextvars()
+
 PATIENT_SERVICE_URL = os.getenv("PATIENT_SERVICE_URL", "http://localhost:8001")
 DOCTOR_SERVICE_URL = os.getenv("DOCTOR_SERVICE_URL", "http://localhost:8002")
 BILLING_SERVICE_URL = os.getenv("BILLING_SERVICE_URL", "http://localhost:8003")
 NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://localhost:8007")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Patient existence and doctor records are near-static; short TTL keeps
+# cache hits cheap without risking stale verdicts for long
+VERIFY_CACHE_TTL_SECONDS = 60
+IDEMPOTENCY_TTL_SECONDS = 86400
 
 # Business rules
 MIN_LEAD_TIME_HOURS = 2
@@ -48,176 +99,303 @@ MAX_RESCHEDULES = 2
 RESCHEDULE_CUTOFF_HOURS = 1
 SLOT_DURATION_MINUTES = 30
 
-@app.on_event("startup")
-async def startup():
-    init_db()
+# Precomputed once so validate_slot compares timedeltas directly instead of
+# rebuilding them and float-dividing on every call
+_LEAD_DELTA = timedelta(hours=MIN_LEAD_TIME_HOURS)
+_SLOT_DELTA = timedelta(minutes=SLOT_DURATION_MINUTES)
+_CLINIC_OPEN, _CLINIC_CLOSE = 9, 18
 
-async def verify_patient(patient_id: int) -> bool:
-    """Verify patient exists"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{PATIENT_SERVICE_URL}/v1/patients/{patient_id}/exists")
-            return response.json().get("exists", False)
-        except:
-            return False
+def get_http(request: Request) -> httpx.AsyncClient:
+    """Shared HTTP client for downstream service calls"""
+    return request.app.state.http
+
+def get_redis(request: Request) -> redis.Redis:
+    """Shared Redis connection pool for verification caching"""
+    return request.app.state.redis
 
-async def verify_doctor(doctor_id: int, department: Optional[str] = None) -> dict:
-    """Verify doctor exists and get department"""
-    async with httpx.AsyncClient() as client:
+async def verify_patient(client: httpx.AsyncClient, cache: redis.Redis, patient_id: int) -> bool:
+    """Verify patient exists (cached)"""
+    key = f"patient:exists:{patient_id}"
+    try:
+        cached = await cache.get(key)
+        if cached is not None:
+            return cached == b"1"
+    except:
+        pass
+
+    try:
+        response = await client.get(f"{PATIENT_SERVICE_URL}/v1/patients/{patient_id}/exists")
+        exists = response.json().get("exists", False)
+    except:
+        return False
+
+    try:
+        await cache.set(key, b"1" if exists else b"0", ex=VERIFY_CACHE_TTL_SECONDS)
+    except:
+        pass
+    return exists
+
+async def verify_doctor(client: httpx.AsyncClient, cache: redis.Redis, doctor_id: int, department: Optional[str] = None) -> dict:
+    """Verify doctor exists and get department (cached)"""
+    key = f"doctor:{doctor_id}:department" if department else f"doctor:{doctor_id}"
+    try:
+        cached = await cache.get(key)
+    except:
+        cached = None
+
+    if cached is not None:
+        doctor = json.loads(cached)
+    else:
         try:
             if department:
-                # Verify department matches
                 response = await client.get(f"{DOCTOR_SERVICE_URL}/v1/doctors/{doctor_id}/department")
-                dept = response.json().get("department")
-                if dept != department:
-                    raise HTTPException(status_code=400, detail=f"Doctor does not belong to department {department}")
             else:
                 response = await client.get(f"{DOCTOR_SERVICE_URL}/v1/doctors/{doctor_id}")
-            
-            return response.json()
+            doctor = response.json()
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 raise HTTPException(status_code=404, detail="Doctor not found")
             raise
 
-def validate_slot(slot_start: datetime, slot_end: datetime):
-    """Validate slot timing"""
-    now = datetime.now()
-    
+        try:
+            await cache.set(key, json.dumps(doctor), ex=VERIFY_CACHE_TTL_SECONDS)
+        except:
+            pass
+
+    if department and doctor.get("department") != department:
+        raise HTTPException(status_code=400, detail=f"Doctor does not belong to department {department}")
+
+    return doctor
+
+def _as_utc(dt: datetime) -> datetime:
+    """Normalize to timezone-aware UTC; naive datetimes are assumed UTC"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def validate_slot(slot_start: datetime, slot_end: datetime, now: datetime) -> tuple:
+    """Validate slot timing against a single per-request clock snapshot.
+
+    Clinic hours are checked on the wall-clock time the client sent (before
+    UTC normalization); the returned pair is normalized to aware UTC for
+    storage and comparisons.
+    """
+    # Check clinic hours on the hour as sent - a 10:00+05:30 booking is a
+    # 10 AM visit, not a 4:30 AM one
+    if not _CLINIC_OPEN <= slot_start.hour < _CLINIC_CLOSE:
+        raise HTTPException(status_code=400, detail="Appointments must be between 9 AM and 6 PM")
+
+    slot_start = _as_utc(slot_start)
+    slot_end = _as_utc(slot_end)
+
     # Check lead time
-    if slot_start < now + timedelta(hours=MIN_LEAD_TIME_HOURS):
+    if slot_start - now < _LEAD_DELTA:
         raise HTTPException(
             status_code=400,
             detail=f"Appointment must be at least {MIN_LEAD_TIME_HOURS} hours from now"
         )
-    
-    # Check clinic hours
-    slot_hour = slot_start.hour
-    if slot_hour < 9 or slot_hour >= 18:
-        raise HTTPException(status_code=400, detail="Appointments must be between 9 AM and 6 PM")
-    
+
     # Check slot duration
-    duration = (slot_end - slot_start).total_seconds() / 60
-    if duration != SLOT_DURATION_MINUTES:
+    if slot_end - slot_start != _SLOT_DELTA:
         raise HTTPException(status_code=400, detail=f"Appointment must be exactly {SLOT_DURATION_MINUTES} minutes")
 
-async def notify_service(event_type: str, data: dict):
+    return slot_start, slot_end
+
+async def notify_service(client: httpx.AsyncClient, event_type: str, data: dict):
     """Send notification to notification service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(
-                f"{NOTIFICATION_SERVICE_URL}/v1/notifications",
-                json={"event_type": event_type, "data": data}
-            )
-        except:
-            logger.warning("notification_service_unavailable", event_type=event_type)
+    try:
+        await client.post(
+            f"{NOTIFICATION_SERVICE_URL}/v1/notifications",
+            json={"event_type": event_type, "data": data}
+        )
+    except:
+        logger.warning("notification_service_unavailable", event_type=event_type)
+
+async def create_bill(client: httpx.AsyncClient, appointment_id: int, patient_id: int, amount: int):
+    """Create a bill with the billing service"""
+    try:
+        response = await client.post(
+            f"{BILLING_SERVICE_URL}/v1/bills",
+            json={
+                "patient_id": patient_id,
+                "appointment_id": appointment_id,
+                "amount": amount
+            }
+        )
+        logger.info("bill_created", appointment_id=appointment_id, bill_id=response.json().get("bill_id"))
+    except:
+        logger.warning("billing_service_unavailable", appointment_id=appointment_id)
+
+async def bill_and_notify(client: httpx.AsyncClient, appointment_id: int, patient_id: int,
+                          amount: int, event_type: str, data: dict):
+    """Billing and notification are independent; run them concurrently"""
+    await asyncio.gather(
+        create_bill(client, appointment_id, patient_id, amount),
+        notify_service(client, event_type, data)
+    )
 
 @app.post("/v1/appointments", response_model=AppointmentResponse, status_code=201)
 async def book_appointment(
     appointment: AppointmentCreate,
-    correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID"),
+    background: BackgroundTasks,
     idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    http: httpx.AsyncClient = Depends(get_http),
+    cache: redis.Redis = Depends(get_redis)
 ):
     """Book a new appointment (idempotent operation)"""
-    if not correlation_id:
-        correlation_id = str(uuid4())
-    
-    # Check idempotency - if idempotency key provided, check for existing appointment
+    # Idempotency: replay the stored response for an already-seen key
+    # without touching the database
     if idempotency_key:
-        # In a real system, you'd store idempotency_key in the appointment table
-        # For now, we'll use a combination of patient_id, doctor_id, and slot_start as idempotency
-        existing = db.query(Appointment).filter(
-            and_(
-                Appointment.patient_id == appointment.patient_id,
-                Appointment.doctor_id == appointment.doctor_id,
-                Appointment.slot_start == appointment.slot_start,
-                Appointment.status == "SCHEDULED"
+        try:
+            cached = await cache.get(f"idempotency:{idempotency_key}")
+        except:
+            cached = None
+
+        if cached is not None:
+            logger.info(
+                "appointment_already_exists",
+                idempotency_key=idempotency_key
             )
-        ).first()
-        
+            return json.loads(cached)
+
+        # Cache miss (Redis down, evicted, or past TTL): fall back to the
+        # database so retries still replay instead of tripping the conflict
+        # checks against their own earlier insert
+        existing = (await db.execute(
+            select(Appointment).where(Appointment.idempotency_key == idempotency_key)
+        )).scalars().first()
+
         if existing:
             logger.info(
                 "appointment_already_exists",
                 appointment_id=existing.appointment_id,
-                idempotency_key=idempotency_key,
-                correlation_id=correlation_id
+                idempotency_key=idempotency_key
             )
             return existing
-    
-    # Verify patient exists
-    if not await verify_patient(appointment.patient_id):
+
+    # Verify patient and doctor concurrently - both are independent downstream calls
+    patient_ok, doctor = await asyncio.gather(
+        verify_patient(http, cache, appointment.patient_id),
+        verify_doctor(http, cache, appointment.doctor_id, appointment.department),
+        return_exceptions=True
+    )
+
+    if isinstance(patient_ok, Exception):
+        raise patient_ok
+    if not patient_ok:
         raise HTTPException(status_code=404, detail="Patient not found")
+
+    if isinstance(doctor, Exception):
+        raise doctor
     
-    # Verify doctor exists and department matches
-    doctor = await verify_doctor(appointment.doctor_id, appointment.department)
-    
-    # Validate slot
-    validate_slot(appointment.slot_start, appointment.slot_end)
-    
-    # Check for overlapping appointments for the same doctor
-    overlapping = db.query(Appointment).filter(
+    # Validate slot against one clock snapshot for the whole request
+    now = datetime.now(timezone.utc)
+    appointment.slot_start, appointment.slot_end = validate_slot(
+        appointment.slot_start, appointment.slot_end, now
+    )
+
+
+    # Doctor overlap, patient overlap, and daily cap fused into a single
+    # round-trip: one SELECT of three scalar subqueries, each index-driven
+    day_start = appointment.slot_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+
+    doctor_conflict = select(Appointment.appointment_id).where(
         and_(
             Appointment.doctor_id == appointment.doctor_id,
             Appointment.status.in_(["SCHEDULED", "COMPLETED"]),
             Appointment.slot_start < appointment.slot_end,
             Appointment.slot_end > appointment.slot_start
         )
-    ).first()
-    
-    if overlapping:
-        raise HTTPException(status_code=409, detail="Doctor has a conflicting appointment")
-    
-    # Check for patient having overlapping appointments
-    patient_overlap = db.query(Appointment).filter(
+    ).limit(1).scalar_subquery()
+
+    patient_conflict = select(Appointment.appointment_id).where(
         and_(
             Appointment.patient_id == appointment.patient_id,
             Appointment.status == "SCHEDULED",
             Appointment.slot_start < appointment.slot_end,
             Appointment.slot_end > appointment.slot_start
         )
-    ).first()
-    
-    if patient_overlap:
-        raise HTTPException(status_code=409, detail="Patient has a conflicting appointment")
-    
-    # Check doctor's daily appointment cap (max 8 appointments/day)
-    appointment_date = appointment.slot_start.date()
-    doctor_appointments = db.query(Appointment).filter(
+    ).limit(1).scalar_subquery()
+
+    # Daily cap (max 8 appointments/day): probe for an 8th row instead of
+    # counting every match - the scan stops after 8 rows
+    daily_cap = select(Appointment.appointment_id).where(
         and_(
             Appointment.doctor_id == appointment.doctor_id,
-            Appointment.slot_start >= datetime.combine(appointment_date, datetime.min.time()),
-            Appointment.slot_start < datetime.combine(appointment_date + timedelta(days=1), datetime.min.time())
+            Appointment.slot_start >= day_start,
+            Appointment.slot_start < day_end
         )
-    ).count()
-    
-    if doctor_appointments >= 8:
+    ).offset(7).limit(1).scalar_subquery()
+
+    doctor_conflict_id, patient_conflict_id, cap_reached = (await db.execute(
+        select(doctor_conflict, patient_conflict, daily_cap)
+    )).one()
+
+    if doctor_conflict_id is not None:
+        raise HTTPException(status_code=409, detail="Doctor has a conflicting appointment")
+
+    if patient_conflict_id is not None:
+        raise HTTPException(status_code=409, detail="Patient has a conflicting appointment")
+
+    if cap_reached is not None:
         raise HTTPException(status_code=400, detail="Doctor has reached maximum daily appointments")
     
-    # Create appointment
-    db_appointment = Appointment(
+    # Create appointment - RETURNING hands back the server-generated fields
+    # (appointment_id, created_at) without a follow-up SELECT
+    stmt = insert(Appointment).values(
         patient_id=appointment.patient_id,
         doctor_id=appointment.doctor_id,
         department=appointment.department,
         slot_start=appointment.slot_start,
         slot_end=appointment.slot_end,
-        status="SCHEDULED"
-    )
-    
-    db.add(db_appointment)
-    db.commit()
-    db.refresh(db_appointment)
-    
+        status="SCHEDULED",
+        idempotency_key=idempotency_key
+    ).returning(Appointment)
+
+    try:
+        db_appointment = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+        # A duplicate idempotency key means a concurrent retry already
+        # created this appointment - return it instead of erroring
+        if idempotency_key:
+            existing = (await db.execute(
+                select(Appointment).where(Appointment.idempotency_key == idempotency_key)
+            )).scalars().first()
+            if existing:
+                logger.info(
+                    "appointment_already_exists",
+                    appointment_id=existing.appointment_id,
+                    idempotency_key=idempotency_key
+                )
+                return existing
+
+        # Exclusion constraint fired: a concurrent booking won the slot
+        raise HTTPException(status_code=409, detail="Appointment conflicts with an existing booking")
+
     logger.info(
         "appointment_created",
         appointment_id=db_appointment.appointment_id,
         patient_id=appointment.patient_id,
-        doctor_id=appointment.doctor_id,
-        correlation_id=correlation_id
+        doctor_id=appointment.doctor_id
     )
+
+    if idempotency_key:
+        try:
+            await cache.set(
+                f"idempotency:{idempotency_key}",
+                AppointmentResponse.model_validate(db_appointment).model_dump_json(),
+                ex=IDEMPOTENCY_TTL_SECONDS
+            )
+        except:
+            pass
     
     # Send notification
-    await notify_service("APPOINTMENT_CONFIRMED", {
+    background.add_task(notify_service, http, "APPOINTMENT_CONFIRMED", {
         "appointment_id": db_appointment.appointment_id,
         "patient_id": appointment.patient_id,
         "doctor_id": appointment.doctor_id,
@@ -229,16 +407,14 @@ async def book_appointment(
 @app.post("/v1/appointments/{appointment_id}/reschedule")
 async def reschedule_appointment(
     appointment_id: int,
+    background: BackgroundTasks,
     new_slot_start: datetime = Query(...),
     new_slot_end: datetime = Query(...),
-    correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    http: httpx.AsyncClient = Depends(get_http)
 ):
     """Reschedule an appointment"""
-    if not correlation_id:
-        correlation_id = str(uuid4())
-    
-    appointment = db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
@@ -251,63 +427,71 @@ async def reschedule_appointment(
         raise HTTPException(status_code=400, detail=f"Maximum {MAX_RESCHEDULES} reschedules allowed")
     
     # Check time cutoff
-    time_until_slot = (appointment.slot_start - datetime.now()).total_seconds() / 3600
+    now = datetime.now(timezone.utc)
+    time_until_slot = (_as_utc(appointment.slot_start) - now).total_seconds() / 3600
     if time_until_slot <= RESCHEDULE_CUTOFF_HOURS:
         raise HTTPException(
             status_code=400,
             detail=f"Cannot reschedule within {RESCHEDULE_CUTOFF_HOURS} hour of appointment"
         )
-    
+
     # Validate new slot
-    validate_slot(new_slot_start, new_slot_end)
+    new_slot_start, new_slot_end = validate_slot(new_slot_start, new_slot_end, now)
     
     # Check conflicts
-    overlapping = db.query(Appointment).filter(
-        and_(
-            Appointment.doctor_id == appointment.doctor_id,
-            Appointment.appointment_id != appointment_id,
-            Appointment.status.in_(["SCHEDULED"]),
-            Appointment.slot_start < new_slot_end,
-            Appointment.slot_end > new_slot_start
-        )
-    ).first()
-    
+    overlapping = (await db.execute(
+        select(Appointment.appointment_id).where(
+            and_(
+                Appointment.doctor_id == appointment.doctor_id,
+                Appointment.appointment_id != appointment_id,
+                Appointment.status.in_(["SCHEDULED"]),
+                Appointment.slot_start < new_slot_end,
+                Appointment.slot_end > new_slot_start
+            )
+        ).limit(1)
+    )).first()
+
     if overlapping:
         raise HTTPException(status_code=409, detail="Doctor has a conflicting appointment at this time")
     
-    # Update appointment
-    appointment.slot_start = new_slot_start
-    appointment.slot_end = new_slot_end
-    appointment.reschedule_count = appointment.reschedule_count + 1
-    
-    db.commit()
-    db.refresh(appointment)
+    # Update appointment - RETURNING folds the reread into the UPDATE itself
+    stmt = update(Appointment).where(
+        Appointment.appointment_id == appointment_id
+    ).values(
+        slot_start=new_slot_start,
+        slot_end=new_slot_end,
+        reschedule_count=Appointment.reschedule_count + 1
+    ).returning(Appointment)
+
+    try:
+        appointment = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Appointment conflicts with an existing booking")
     
     logger.info(
         "appointment_rescheduled",
         appointment_id=appointment_id,
-        reschedule_count=appointment.reschedule_count,
-        correlation_id=correlation_id
+        reschedule_count=appointment.reschedule_count
     )
     
-    await notify_service("APPOINTMENT_RESCHEDULED", {
+    background.add_task(notify_service, http, "APPOINTMENT_RESCHEDULED", {
         "appointment_id": appointment_id,
         "new_slot_start": new_slot_start.isoformat()
     })
     
     return appointment
 
-@app.post("/v1/appointments/{appointment_id}/cancel")
+@app.post("/v1/appointments/{appointment_id}/cancel", response_model=AppointmentStatusResponse)
 async def cancel_appointment(
     appointment_id: int,
-    correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID"),
-    db: Session = Depends(get_db)
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    http: httpx.AsyncClient = Depends(get_http)
 ):
     """Cancel an appointment"""
-    if not correlation_id:
-        correlation_id = str(uuid4())
-    
-    appointment = db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
@@ -316,17 +500,16 @@ async def cancel_appointment(
         raise HTTPException(status_code=400, detail="Only scheduled appointments can be cancelled")
     
     # Calculate cancellation policy
-    now = datetime.now()
-    hours_until_slot = (appointment.slot_start - now).total_seconds() / 3600
+    now = datetime.now(timezone.utc)
+    hours_until_slot = (_as_utc(appointment.slot_start) - now).total_seconds() / 3600
     
     appointment.status = "CANCELLED"
-    db.commit()
+    await db.commit()
     
     logger.info(
         "appointment_cancelled",
         appointment_id=appointment_id,
-        hours_until_slot=hours_until_slot,
-        correlation_id=correlation_id
+        hours_until_slot=hours_until_slot
     )
     
     # Handle billing
@@ -341,24 +524,22 @@ async def cancel_appointment(
         # No-show fee
         pass
     
-    await notify_service("APPOINTMENT_CANCELLED", {
+    background.add_task(notify_service, http, "APPOINTMENT_CANCELLED", {
         "appointment_id": appointment_id,
         "refund_info": "Full refund" if hours_until_slot > 2 else "50% refund"
     })
     
     return appointment
 
-@app.post("/v1/appointments/{appointment_id}/complete")
+@app.post("/v1/appointments/{appointment_id}/complete", response_model=AppointmentStatusResponse)
 async def complete_appointment(
     appointment_id: int,
-    correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID"),
-    db: Session = Depends(get_db)
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    http: httpx.AsyncClient = Depends(get_http)
 ):
     """Mark appointment as completed"""
-    if not correlation_id:
-        correlation_id = str(uuid4())
-    
-    appointment = db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
@@ -367,105 +548,82 @@ async def complete_appointment(
         raise HTTPException(status_code=400, detail="Only scheduled appointments can be completed")
     
     appointment.status = "COMPLETED"
-    db.commit()
-    db.refresh(appointment)
+    await db.commit()
     
-    logger.info("appointment_completed", appointment_id=appointment_id, correlation_id=correlation_id)
+    logger.info("appointment_completed", appointment_id=appointment_id)
     
-    # Create bill
-    async with httpx.AsyncClient() as client:
-        try:
-            bill_response = await client.post(
-                f"{BILLING_SERVICE_URL}/v1/bills",
-                json={
-                    "patient_id": appointment.patient_id,
-                    "appointment_id": appointment_id,
-                    "amount": 500  # Base consultation fee
-                }
-            )
-            logger.info("bill_created", appointment_id=appointment_id, bill_id=bill_response.json().get("bill_id"))
-        except:
-            logger.warning("billing_service_unavailable", appointment_id=appointment_id)
-    
-    await notify_service("APPOINTMENT_COMPLETED", {
-        "appointment_id": appointment_id,
-        "bill_required": True
-    })
+    # Bill (base consultation fee) and notify concurrently, off the response path
+    background.add_task(
+        bill_and_notify, http, appointment_id, appointment.patient_id, 500,
+        "APPOINTMENT_COMPLETED", {
+            "appointment_id": appointment_id,
+            "bill_required": True
+        }
+    )
     
     return appointment
 
-@app.post("/v1/appointments/{appointment_id}/noshow")
+@app.post("/v1/appointments/{appointment_id}/noshow", response_model=AppointmentStatusResponse)
 async def mark_no_show(
     appointment_id: int,
-    correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID"),
-    db: Session = Depends(get_db)
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    http: httpx.AsyncClient = Depends(get_http)
 ):
     """Mark appointment as no-show"""
-    if not correlation_id:
-        correlation_id = str(uuid4())
-    
-    appointment = db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     
     appointment.status = "NO_SHOW"
-    db.commit()
+    await db.commit()
     
-    logger.info("appointment_noshow", appointment_id=appointment_id, correlation_id=correlation_id)
+    logger.info("appointment_noshow", appointment_id=appointment_id)
     
-    # Create bill for no-show
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(
-                f"{BILLING_SERVICE_URL}/v1/bills",
-                json={
-                    "patient_id": appointment.patient_id,
-                    "appointment_id": appointment_id,
-                    "amount": 250  # 50% no-show fee
-                }
-            )
-        except:
-            pass
-    
-    await notify_service("NO_SHOW", {
-        "appointment_id": appointment_id,
-        "rebook_link": f"/appointments/book?doctor_id={appointment.doctor_id}"
-    })
+    # Bill (50% no-show fee) and notify concurrently, off the response path
+    background.add_task(
+        bill_and_notify, http, appointment_id, appointment.patient_id, 250,
+        "NO_SHOW", {
+            "appointment_id": appointment_id,
+            "rebook_link": f"/appointments/book?doctor_id={appointment.doctor_id}"
+        }
+    )
     
     return appointment
 
 @app.get("/v1/appointments", response_model=List[AppointmentResponse])
-def get_appointments(
+async def get_appointments(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     patient_id: Optional[int] = None,
     doctor_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get appointments with filters"""
-    query = db.query(Appointment)
-    
+    stmt = select(Appointment)
+
     if patient_id:
-        query = query.filter(Appointment.patient_id == patient_id)
-    
+        stmt = stmt.where(Appointment.patient_id == patient_id)
+
     if doctor_id:
-        query = query.filter(Appointment.doctor_id == doctor_id)
-    
+        stmt = stmt.where(Appointment.doctor_id == doctor_id)
+
     if status:
-        query = query.filter(Appointment.status == status)
-    
-    total = query.count()
-    appointments = query.order_by(Appointment.slot_start.desc()).offset(skip).limit(limit).all()
-    
-    logger.info("appointments_retrieved", total=total, returned=len(appointments))
+        stmt = stmt.where(Appointment.status == status)
+
+    appointments = (await db.execute(
+        stmt.order_by(Appointment.slot_start.desc()).offset(skip).limit(limit)
+    )).scalars().all()
+
+    logger.info("appointments_retrieved", returned=len(appointments))
     return appointments
 
 @app.get("/v1/appointments/{appointment_id}", response_model=AppointmentResponse)
-def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
+async def get_appointment(appointment_id: int, db: AsyncSession = Depends(get_db)):
     """Get appointment by ID"""
-    appointment = db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
@@ -478,7 +636,13 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    import os
     port = int(os.getenv("PORT", 8004))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
 
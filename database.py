@@ -1,28 +1,87 @@
 """Database configuration"""
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 import os
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./appointment.db")
+# PGBOUNCER_URL points at a transaction-pooled bouncer (typically port 6432)
+# and takes precedence over DATABASE_URL when set
+_USING_PGBOUNCER = bool(os.getenv("PGBOUNCER_URL"))
+DATABASE_URL = os.getenv("PGBOUNCER_URL") or os.getenv("DATABASE_URL", "sqlite:///./appointment.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+def _async_url(url: str) -> str:
+    """Map sync driver URLs onto their async drivers"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+# Pool tuning only applies to real database servers; sqlite dev databases
+# keep the driver defaults
+_pool_kwargs = {} if "sqlite" in DATABASE_URL else {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+
+if "sqlite" in DATABASE_URL:
+    _connect_args = {"check_same_thread": False}
+elif _USING_PGBOUNCER:
+    # Transaction pooling hands each transaction an arbitrary server
+    # connection, so server-side prepared statements from a previous
+    # transaction are gone; disable asyncpg's statement cache and
+    # SQLAlchemy's prepared-statement cache to avoid
+    # "prepared statement __asyncpg_stmt_N__ does not exist" under load
+    _connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+else:
+    _connect_args = {}
+
+engine = create_async_engine(
+    _async_url(DATABASE_URL),
+    connect_args=_connect_args,
+    **_pool_kwargs
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def init_db():
-    from models import Appointment
-    Base.metadata.create_all(bind=engine)
+# Exclusion constraints reject overlapping SCHEDULED slots inside the INSERT
+# itself, closing the race window between the overlap SELECT and the commit.
+# GiST range overlap is Postgres-only, so these are skipped on sqlite.
+_OVERLAP_CONSTRAINTS = {
+    "no_doctor_overlap": (
+        "ALTER TABLE appointments ADD CONSTRAINT no_doctor_overlap "
+        "EXCLUDE USING gist (doctor_id WITH =, tstzrange(slot_start, slot_end) WITH &&) "
+        "WHERE (status = 'SCHEDULED')"
+    ),
+    "no_patient_overlap": (
+        "ALTER TABLE appointments ADD CONSTRAINT no_patient_overlap "
+        "EXCLUDE USING gist (patient_id WITH =, tstzrange(slot_start, slot_end) WITH &&) "
+        "WHERE (status = 'SCHEDULED')"
+    ),
+}
 
+async def init_db():
+    from models import Appointment
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            for name, ddl in _OVERLAP_CONSTRAINTS.items():
+                exists = (await conn.execute(
+                    text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                    {"name": name}
+                )).first()
+                if not exists:
+                    await conn.execute(text(ddl))
@@ -1,5 +1,5 @@
 """Database models and schemas"""
-from sqlalchemy import Column, Integer, String, DateTime, Integer as SQLInteger
+from sqlalchemy import Column, Integer, String, DateTime, Index, text, Integer as SQLInteger
 from sqlalchemy.sql import func
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
@@ -16,15 +16,31 @@ class AppointmentStatus(str, Enum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
-    
+    __table_args__ = (
+        # Composite index covering the overlap predicate on every booking/reschedule
+        Index("ix_appt_doctor_status_slot", "doctor_id", "status", "slot_start", "slot_end"),
+        # Partial indexes keep the hot SCHEDULED-only overlap checks narrow
+        Index(
+            "ix_appt_scheduled_doctor_slot", "doctor_id", "slot_start",
+            postgresql_where=text("status = 'SCHEDULED'"),
+            sqlite_where=text("status = 'SCHEDULED'")
+        ),
+        Index(
+            "ix_appt_scheduled_patient_slot", "patient_id", "slot_start",
+            postgresql_where=text("status = 'SCHEDULED'"),
+            sqlite_where=text("status = 'SCHEDULED'")
+        ),
+    )
+
     appointment_id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, nullable=False, index=True)
     doctor_id = Column(Integer, nullable=False, index=True)
     department = Column(String, nullable=False)
-    slot_start = Column(DateTime, nullable=False, index=True)
-    slot_end = Column(DateTime, nullable=False)
+    slot_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    slot_end = Column(DateTime(timezone=True), nullable=False)
     status = Column(String, nullable=False, default="SCHEDULED")
     reschedule_count = Column(Integer, default=0)
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class AppointmentCreate(BaseModel):
@@ -39,6 +55,14 @@ class AppointmentUpdate(BaseModel):
     slot_end: Optional[datetime] = None
     status: Optional[AppointmentStatus] = None
 
+class AppointmentStatusResponse(BaseModel):
+    """Minimal response for status-transition endpoints"""
+    appointment_id: int
+    status: str
+
+    class Config:
+        from_attributes = True
+
 class AppointmentResponse(BaseModel):
     appointment_id: int
     patient_id: int